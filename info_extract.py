@@ -1,7 +1,7 @@
 import os
 import dotenv
-import base64
-import json
+from binascii import b2a_base64
+import orjson
 from openai import OpenAI
 
 dotenv.load_dotenv()
@@ -16,7 +16,10 @@ def extract_information(file_bytes, mime_type="image/png"):
     Upstage Universal Information Extraction APIを使って
     名刺画像から name, company_name, position を抽出します。
     """
-    base64_data = base64.b64encode(file_bytes).decode("utf-8")
+    # data URL を bytes のまま組み立て、文字列化は最後の 1 回だけにする
+    data_url = (
+        b"data:" + (mime_type or "image/png").encode() + b";base64," + b2a_base64(file_bytes, newline=False)
+    ).decode("ascii")
 
     schema = {
         "type": "object",
@@ -45,7 +48,7 @@ def extract_information(file_bytes, mime_type="image/png"):
                     "content": [
                         {
                             "type": "image_url",
-                            "image_url": {"url": f"data:{mime_type};base64,{base64_data}"}
+                            "image_url": {"url": data_url}
                         }
                     ]
                 }
@@ -60,7 +63,7 @@ def extract_information(file_bytes, mime_type="image/png"):
         )
 
         content = extraction_response.choices[0].message.content
-        result = json.loads(content)
+        result = orjson.loads(content)
         return result
 
     except Exception as e:
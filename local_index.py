@@ -0,0 +1,39 @@
+"""ローカルベクトルインデックス - 小規模コーパスを numpy 行列で保持し、Pinecone への問い合わせを省略"""
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# これを超える件数はメモリに載せず、Pinecone 検索にフォールバックする
+MAX_LOCAL_VECTORS = 100_000
+
+
+class LocalVectorIndex:
+    def __init__(self, vectors: Sequence[Dict]):
+        """upsert 用のベクトル (values / metadata.text) から正規化済み行列を作成"""
+        matrix = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.maximum(norms, 1e-12)
+        self.texts = [v["metadata"]["text"] for v in vectors]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def query(self, vector: Sequence[float], top_k: int) -> List[str]:
+        """コサイン類似度の上位 top_k 件のテキストを類似度順で返す"""
+        if not self.texts:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        scores = self.matrix @ (q / max(np.linalg.norm(q), 1e-12))
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.texts[i] for i in top]
+
+    @classmethod
+    def build(cls, vectors: Sequence[Dict]) -> "LocalVectorIndex | None":
+        """件数が空または上限を超える場合は None (Pinecone を使う)"""
+        if not vectors or len(vectors) > MAX_LOCAL_VECTORS:
+            return None
+        return cls(vectors)
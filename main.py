@@ -1,8 +1,8 @@
 """main.py – FastAPI + Strands Agents
 
-* 名刺画像解析 → 人物・会社概要抽出
-* `upsert_topics.init_topics()` をアプリ起動時に呼び出して Pinecone 更新
-* Strands Tools: Google Custom Search 検索, Pinecone ベクトル検索
+* 名刺画像解析 → 人物・会社概要抽出 (POST /upload でジョブ登録、GET /jobs/{job_id} で結果取得)
+* `upsert.upsert_topics()` を lifespan のバックグラウンドタスクで呼び出して Pinecone 更新
+* 検索ヘルパー: Google Custom Search 検索, Pinecone ベクトル検索 (/upload で並行に事前取得し、プロンプトに埋め込む)
 """
 from __future__ import annotations
 
@@ -10,20 +10,27 @@ from __future__ import annotations
 # Imports
 # ---------------------------------------------------------------------------
 import os
+import asyncio
+import fcntl
 import logging
+import time
 import uuid
-from typing import List
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, TextIO
 
 import dotenv
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from googleapiclient.discovery import build
+import httpx
 from openai import OpenAI
 from pinecone import Pinecone
-from strands import Agent, tool
+from strands import Agent
+from strands.models import BedrockModel
 from pydantic import BaseModel
 
-from s3_service import S3Service
+from s3_service import S3Service, generate_object_id
+from local_index import LocalVectorIndex
 
 from info_extract import extract_information
 from upsert import upsert_topics
@@ -35,6 +42,7 @@ dotenv.load_dotenv()
 
 TOP_K           = int(os.getenv("TOP_K", 3))
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", 512))
 
 OPENAI_API_KEY  = os.getenv("OPENAI_API_KEY")
 PINECONE_API_KEY= os.getenv("PINECONE_API_KEY")
@@ -46,6 +54,17 @@ GOOGLE_API_KEY          = os.getenv("GOOGLE_API_KEY")
 NAME_COMPANY_SEARCH     = os.getenv("NAME_COMPANY_SEARCH")
 FUSIC_SOLUTIONS_SEARCH  = os.getenv("FUSIC_SOLUTIONS_SEARCH")
 CSE_SEARCH_NUMBER       = int(os.getenv("SEARCH_NUMBER", 3))
+EMBED_CACHE_SIZE        = int(os.getenv("EMBED_CACHE_SIZE", 4096))
+
+# ブートストラップはロックファイルを取得できた 1 プロセスだけが実行する ("0" で無効化)
+RUN_BOOTSTRAP       = os.getenv("RUN_BOOTSTRAP", "1") == "1"
+BOOTSTRAP_LOCK_FILE = os.getenv("BOOTSTRAP_LOCK_FILE", "/tmp/business-card-analyzer-bootstrap.lock")
+
+# /upload のジョブを処理するワーカー数と、完了ジョブの保持時間
+JOB_WORKERS     = int(os.getenv("JOB_WORKERS", 4))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", 3600))
+# 待機できるジョブ数の上限 (画像バイト列を保持するため、超えた分は 503 で断る)
+JOB_QUEUE_SIZE  = int(os.getenv("JOB_QUEUE_SIZE", 32))
 
 ALLOW_ORIGINS = ["http://localhost:5173, https://686f4cdcb5a535d805e636e3--business-card-analyzer.netlify.app"]
 
@@ -58,11 +77,30 @@ LOG = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 # External clients
 # ---------------------------------------------------------------------------
+# OpenAI SDK は既定で keep-alive 付きの接続プールを使う
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
-pinecone = Pinecone(api_key=os.getenv("PINECONE_API_KEY"), environment=os.getenv("PINECONE_ENVIRONMENT"))
+pinecone = Pinecone(
+    api_key=os.getenv("PINECONE_API_KEY"),
+    environment=os.getenv("PINECONE_ENVIRONMENT"),
+    pool_threads=30,
+)
 booth_index = pinecone.Index(PINECONE_BOOTH_INDEX_NAME)
 topic_index = pinecone.Index(PINECONE_TOPIC_INDEX_NAME)
 
+# Bedrock モデル (boto3 クライアントと接続プールを全リクエストで共有)
+bedrock_model = BedrockModel()
+
+# 起動時に upsert したベクトルのローカルコピー (未構築・件数超過時は Pinecone を使う)
+local_booth_index: LocalVectorIndex | None = None
+local_topic_index: LocalVectorIndex | None = None
+
+# Google Custom Search (REST API を keep-alive 付きの共有クライアントで直接呼び出す)
+CSE_URL = "https://www.googleapis.com/customsearch/v1"
+cse_client = httpx.Client(
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    timeout=10,
+)
+
 # S3サービスの初期化
 s3_service = S3Service()
 
@@ -70,79 +108,86 @@ s3_service = S3Service()
 # Helpers
 # ---------------------------------------------------------------------------
 
+def cse_search(query: str, cx: str) -> List[dict]:
+    """Google Custom Search を実行し、検索結果の items を返す"""
+    # API キーはヘッダーで渡し、エラーメッセージ (URL を含む) に残らないようにする
+    rsp = cse_client.get(
+        CSE_URL,
+        params={"cx": cx, "q": query, "num": CSE_SEARCH_NUMBER},
+        headers={"x-goog-api-key": GOOGLE_API_KEY or ""},
+    )
+    rsp.raise_for_status()
+    return rsp.json().get("items", [])
+
 def embed_query(text: str) -> List[float]:
-    rsp = openai_client.embeddings.create(model=EMBEDDING_MODEL, input=[text])
+    """クエリをベクトル化 (同一テキストはプロセス内でキャッシュ)"""
+    return _embed_query_cached(" ".join(text.split()))
+
+@lru_cache(maxsize=EMBED_CACHE_SIZE)
+def _embed_query_cached(text: str) -> List[float]:
+    rsp = openai_client.embeddings.create(model=EMBEDDING_MODEL, input=[text], dimensions=EMBEDDING_DIMENSIONS)
     return rsp.data[0].embedding
 
 # ---------------------------------------------------------------------------
-# Strands Tools
+# Search helpers (prefetch_context から並行に呼び出す)
 # ---------------------------------------------------------------------------
 
-@tool
 def search_booth_from_index(query: str) -> str:
     """Pinecone ベクトル検索でブース情報を取得"""
     vec = embed_query(query)
+    if local_booth_index is not None:
+        texts = local_booth_index.query(vec, TOP_K)
+        return "\n---\n".join(texts) if texts else "関連ブース情報が見つかりませんでした。"
     rsp = booth_index.query(vector=vec, top_k=TOP_K, include_metadata=True)    
     return "\n---\n".join(m.metadata["text"] for m in rsp.matches) if rsp.matches else "関連ブース情報が見つかりませんでした。"
 
-@tool
 def search_topic_from_index(query: str) -> str:
     """Pinecone ベクトル検索でご興味のありそうな情報を取得"""
     vec = embed_query(query)
+    if local_topic_index is not None:
+        texts = local_topic_index.query(vec, TOP_K)
+        return "\n---\n".join(texts) if texts else "関連トピックが見つかりませんでした。"
     rsp = topic_index.query(vector=vec, top_k=TOP_K, include_metadata=True)
     return "\n---\n".join(m.metadata["text"] for m in rsp.matches) if rsp.matches else "関連トピックが見つかりませんでした。"
 
-@tool
 def search_name_and_company(name: str, company_name: str) -> str:
     if not name and not company_name:
         return "検索結果がありませんでした。名前と会社名が指定されていません。"
-    svc = build("customsearch", "v1", developerKey=GOOGLE_API_KEY)
-    items = (
-        svc.cse()
-        .list(q=f"{name} {company_name}".strip(), cx=NAME_COMPANY_SEARCH, num=CSE_SEARCH_NUMBER)
-        .execute()
-        .get("items", [])
-    )
+    items = cse_search(f"{name} {company_name}".strip(), NAME_COMPANY_SEARCH)
     if not items:
         return f"{name} / {company_name} に関連する情報は見つかりませんでした。"
     return "\n".join(f"- {i['title']}: {i['link']}" for i in items)
 
 
-@tool
 def get_fusic_solutions(query: str) -> str:
     if not query:
         return "検索結果がありませんでした。クエリが指定されていません。"
     try:
-        svc = build("customsearch", "v1", developerKey=GOOGLE_API_KEY)
-        response = svc.cse().list(q=query, cx=FUSIC_SOLUTIONS_SEARCH, num=CSE_SEARCH_NUMBER).execute()
-        items = response.get("items", [])
+        items = cse_search(query, FUSIC_SOLUTIONS_SEARCH)
         if not items:
             return f"クエリ '{query}' に関連するFusicの開発事例は見つかりませんでした。"
         return "\n".join(f"- {i['title']}: {i['link']}" for i in items)
     except Exception as e:
         LOG.error("Google Custom Search API の呼び出し中にエラーが発生しました: %s", e)
-        return f"クエリ '{query}' の検索中にエラーが発生しました: {str(e)}"
+        return f"クエリ '{query}' の検索中にエラーが発生しました。"
 
 # ---------------------------------------------------------------------------
 # Agent
 # ---------------------------------------------------------------------------
 
-agent = Agent(
-    tools=[search_name_and_company, search_booth_from_index, search_topic_from_index, get_fusic_solutions],
-    system_prompt="""
-あなたは名刺情報を基に以下を実施するアシスタントです。
+AGENT_SYSTEM_PROMPT = """
+あなたは名刺情報と、事前に取得済みの検索結果を基に以下を実施するアシスタントです。
 
-1. **search_name_and_company** で人物・会社概要を取得
-2. **search_booth_from_index** でDiscoveryのイべント情報と最新ITトレンドを元に、ブース情報1つを生成
-3. **search_topic_from_index** でDiscoveryのイべント情報と最新ITトレンドを元に、ご興味のありそうな情報を2つ生成
-4. **get_fusic_solutions** で Fusic の開発事例を 3 件取得
+1. **人物・会社の検索結果** から人物・会社概要を要約
+2. **ブース情報** からDiscoveryのイべント情報と最新ITトレンドを元に、ブース情報1つを生成
+3. **トピック情報** からDiscoveryのイべント情報と最新ITトレンドを元に、ご興味のありそうな情報を2つ生成
+4. **Fusic の開発事例** から 3 件を選定
 
 ### 出力フォーマット
     ---
     【人物と会社の要約】
     <人物と会社の要約を記載してください>
 
-    【Discovery Event ＆ その他情報】
     【Discovery Event ＆ その他情報】
     1. イベント情報（太字）
         <ブース情報のまとめを記載してください>
@@ -159,8 +204,147 @@ agent = Agent(
     3. <開発事例3のタイトル（太字）>: <開発事例3のURL>
         情報
     ---
-""",
-)
+"""
+
+def create_agent() -> Agent:
+    """リクエストごとに会話履歴を持たない Agent を生成 (検索はツール経由ではなく事前取得)"""
+    return Agent(model=bedrock_model, system_prompt=AGENT_SYSTEM_PROMPT)
+
+async def _lookup(label: str, fallback: str, func, *args) -> str:
+    """検索を 1 件実行し、失敗時はログを残してフォールバック文言を返す"""
+    try:
+        return await asyncio.to_thread(func, *args)
+    except Exception:
+        LOG.exception("%s の取得に失敗しました", label)
+        return fallback
+
+async def prefetch_context(name: str, company_name: str, position: str) -> dict:
+    """互いに依存しない検索を並行実行し、プロンプトに埋め込む検索結果を返す
+
+    1 件の失敗で解析全体が止まらないよう、各検索は個別にフォールバックする。
+    """
+    interest_query = f"{company_name} {position}".strip()
+    profile, booth, topics, solutions = await asyncio.gather(
+        _lookup("人物・会社情報", f"{name} / {company_name} に関連する情報は見つかりませんでした。",
+                search_name_and_company, name, company_name),
+        _lookup("ブース情報", "関連ブース情報が見つかりませんでした。",
+                search_booth_from_index, interest_query),
+        _lookup("トピック情報", "関連トピックが見つかりませんでした。",
+                search_topic_from_index, interest_query),
+        _lookup("Fusic の開発事例", f"クエリ '{interest_query}' に関連するFusicの開発事例は見つかりませんでした。",
+                get_fusic_solutions, interest_query),
+    )
+    return {"profile": profile, "booth": booth, "topics": topics, "solutions": solutions}
+
+# ---------------------------------------------------------------------------
+# Business card pipeline & job queue
+# ---------------------------------------------------------------------------
+
+class ExtractionError(Exception):
+    """名刺画像から必須項目を抽出できなかった"""
+
+async def analyze_business_card(content: bytes, mime_type: str) -> dict:
+    """名刺画像から情報を抽出し、検索結果を踏まえたエージェントの要約を返す"""
+    extracted_info = await asyncio.to_thread(
+        extract_information, file_bytes=content, mime_type=mime_type
+    )
+    required_fields = ["name", "company_name", "position"]
+    if not all(field in extracted_info for field in required_fields):
+        raise ExtractionError("名刺情報から以下の項目を取得できませんでした: " + ", ".join(required_fields))
+    context = await prefetch_context(
+        extracted_info["name"], extracted_info["company_name"], extracted_info["position"]
+    )
+    prompt = f"""
+    以下は名刺から抽出された情報です：
+    - 氏名: {extracted_info['name']}
+    - 会社名: {extracted_info['company_name']}
+    - 役職・部署: {extracted_info['position']}
+
+    以下は事前に取得した検索結果です：
+
+    ### 人物・会社の検索結果
+    {context['profile']}
+
+    ### ブース情報
+    {context['booth']}
+
+    ### トピック情報
+    {context['topics']}
+
+    ### Fusic の開発事例
+    {context['solutions']}
+
+    この情報をもとに、以下を出力してください。内容は簡潔に要点を押さえて出力してください：
+
+    1. 名刺情報と検索結果から人物と社概要をまとめてください。
+    2. Discoveryのイベント情報と最新ITトレンドを元に、ブース情報1つを生成してください。
+    3. Discoveryのイベント情報と最新ITトレンドを元に、ご興味のありそうな情報を2つ生成してください。
+    4. 上記の情報をもとに、Fusic の開発事例から関心がありそうなもの3つを選定・提示してください。
+
+    出力形式：
+    ---
+    【人物と会社の要約】
+    <人物と会社の要約を記載してください>
+
+    【Discovery Event ＆ その他情報】
+    1. イベント情報
+        <ブース情報のまとめを記載してください>
+    2. 情報1
+        <情報のまとめを記載してください>
+    3. 情報2
+        <情報のまとめを記載してください>
+
+    【Fusicから提案可能な開発事例】
+    1. <開発事例1のタイトル>: <開発事例1のURL>
+        情報
+    2. <開発事例2のタイトル>: <開発事例2のURL>
+        情報
+    3. <開発事例3のタイトル>: <開発事例3のURL>
+        情報
+    ---
+    """
+
+    result = await asyncio.to_thread(create_agent(), prompt)
+
+    if hasattr(result, 'message'):
+        final_message_blocks = result.message.get("content", [])
+        final_text = "\n".join(block.get("text", "") for block in final_message_blocks if "text" in block)
+    else:
+        final_text = str(result)
+
+    return {"summary": final_text, "extracted_info": extracted_info}
+
+# job_id -> {"status", "result", "error", "updated_at"} (プロセス内のみで保持)
+jobs: Dict[str, dict] = {}
+job_queue: asyncio.Queue = asyncio.Queue(maxsize=JOB_QUEUE_SIZE)
+
+def prune_jobs():
+    """完了・失敗から JOB_TTL_SECONDS を過ぎたジョブを破棄"""
+    expire_before = time.monotonic() - JOB_TTL_SECONDS
+    expired = [
+        job_id for job_id, job in jobs.items()
+        if job["status"] in ("completed", "failed") and job["updated_at"] < expire_before
+    ]
+    for job_id in expired:
+        del jobs[job_id]
+
+async def job_worker():
+    """キューから名刺解析ジョブを取り出して処理し、結果を jobs に記録"""
+    while True:
+        job_id, content, mime_type = await job_queue.get()
+        job = jobs[job_id]
+        job.update(status="processing", updated_at=time.monotonic())
+        try:
+            job["result"] = await analyze_business_card(content, mime_type)
+            job["status"] = "completed"
+        except ExtractionError as e:
+            job.update(status="failed", error=str(e))
+        except Exception:
+            LOG.exception("名刺解析に失敗しました (job_id=%s)", job_id)
+            job.update(status="failed", error="Failed to process image")
+        finally:
+            job["updated_at"] = time.monotonic()
+            job_queue.task_done()
 
 # ---------------------------------------------------------------------------
 # Application Initialization
@@ -168,17 +352,67 @@ agent = Agent(
 
 def initialize_application():
     """アプリケーションの初期化処理"""
-    upsert_topics()  # Pinecone のトピックを初期化
+    global local_booth_index, local_topic_index
+    booth_vectors, topic_vectors = upsert_topics()  # Pinecone のトピックを初期化
     logging.info("Pinecone topics initialized.")
+    local_booth_index = LocalVectorIndex.build(booth_vectors)
+    local_topic_index = LocalVectorIndex.build(topic_vectors)
+    LOG.info(
+        "Local vector indexes: booth=%s, topic=%s",
+        len(local_booth_index) if local_booth_index else "pinecone",
+        len(local_topic_index) if local_topic_index else "pinecone",
+    )
 
-# アプリケーションの初期化を実行
-initialize_application()
+# ブートストラップ担当プロセスが終了まで保持するロック
+bootstrap_lock: Optional[TextIO] = None
+
+def acquire_bootstrap_lock() -> Optional[TextIO]:
+    """ロックファイルに非ブロッキングで排他ロックを掛け、取得できなければ None を返す"""
+    lock_file = open(BOOTSTRAP_LOCK_FILE, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+async def run_bootstrap():
+    """初期化処理をスレッドで実行し、失敗してもサーバーは継続させる
+
+    同じホストのワーカー (uvicorn --workers / gunicorn) のうち、ロックを取得した
+    1 プロセスだけが実行する。ロックはプロセス終了まで保持し、後から起動した
+    ワーカーが再実行しないようにする。
+    """
+    global bootstrap_lock
+    bootstrap_lock = acquire_bootstrap_lock()
+    if bootstrap_lock is None:
+        LOG.info("別のワーカーが初期化を担当するため、ブートストラップをスキップします")
+        return
+    try:
+        await asyncio.to_thread(initialize_application)
+    except Exception:
+        LOG.exception("Pinecone topics の初期化に失敗しました")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """起動時に初期化とジョブワーカーをバックグラウンドで開始し、終了時に片付ける"""
+    bootstrap_task = asyncio.create_task(run_bootstrap()) if RUN_BOOTSTRAP else None
+    workers = [asyncio.create_task(job_worker()) for _ in range(JOB_WORKERS)]
+    yield
+    for worker in workers:
+        worker.cancel()
+    if bootstrap_task and not bootstrap_task.done():
+        bootstrap_task.cancel()
+    if bootstrap_lock is not None:
+        bootstrap_lock.close()
+    openai_client.close()
+    cse_client.close()
 
 # ---------------------------------------------------------------------------
 # FastAPI App
 # ---------------------------------------------------------------------------
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     #allow_origins=ALLOW_ORIGINS,
@@ -201,27 +435,24 @@ async def upload_image(file: UploadFile = File(...)):
     LOG.info(f"Received file: {file.filename}, Content-Type: {file.content_type}")
 
     try:
-        # 画像データ読み込み
-        image_data = await file.read()
-        if not image_data:
+        # 画像データはメモリに読み込まず、スプールされたファイルのまま扱う
+        if not file.size:
             raise HTTPException(status_code=400, detail="画像データが空です")
 
         # S3 の公開プレフィクスを使い、推測されにくいキー名を付与
-        key = f"public/business-card/{uuid.uuid4()}.png"
-
-        # オブジェクトをアップロード（ACL を public-read に）
-        s3_service.s3_client.put_object(
-            Bucket=s3_service.bucket_name,
-            Key=key,
-            Body=image_data,
-            ContentType=file.content_type or "image/png",
+        key = f"public/business-card/{generate_object_id()}.png"
+
+        # オブジェクトをストリーミングでアップロード（ACL を public-read に）
+        await asyncio.to_thread(
+            s3_service.s3_client.upload_fileobj,
+            file.file,
+            s3_service.bucket_name,
+            key,
+            ExtraArgs={"ContentType": file.content_type or "image/png"},
         )
 
         # 公開 URL を組み立て
-        region = s3_service.s3_client.meta.region_name or "us-east-1"
-        public_url = (
-            f"https://{s3_service.bucket_name}.s3.{region}.amazonaws.com/{key}"
-        )
+        public_url = s3_service.public_url_prefix + key
 
         return {
             "success": True,
@@ -238,67 +469,22 @@ async def upload_image(file: UploadFile = File(...)):
             detail=f"画像アップロード中にエラーが発生しました: {e}"
         )
 
-@app.post("/upload")
+@app.post("/upload", status_code=202)
 async def upload_image(file: UploadFile = File(...)):
+    """名刺解析ジョブを登録し、job_id を即時に返す (結果は GET /jobs/{job_id} で取得)"""
     content = await file.read()
+    prune_jobs()
+    job_id = uuid.uuid4().hex
     try:
-        extracted_info = extract_information(file_bytes=content, mime_type=file.content_type)
-        required_fields = ["name", "company_name", "position"]
-        if not all(field in extracted_info for field in required_fields):
-            return {"error": "名刺情報から以下の項目を取得できませんでした: " + ", ".join(required_fields)}
-        prompt = f"""
-        以下は名刺から抽出された情報です：
-        - 氏名: {extracted_info['name']}
-        - 会社名: {extracted_info['company_name']}
-        - 役職・部署: {extracted_info['position']}
-
-        この情報をもとに、以下を調査・出力してください。内容は簡潔に要点を押さえて出力してください：
-
-        1. 名刺情報から人物と社概要を取得してください。
-        2. Discoveryのイベント情報と最新ITトレンドを元に、ブース情報1つを生成してください。
-        3. Discoveryのイベント情報と最新ITトレンドを元に、ご興味のありそうな情報を2つ生成してください。
-        4. 上記の情報をもとに、Fusic の開発事例から関心がありそうなもの3つを選定・提示してください。
-
-        出力形式：
-        ---
-        【人物と会社の要約】
-        <人物と会社の要約を記載してください>
-
-        【Discovery Event ＆ その他情報】
-        1. イベント情報
-            <ブース情報のまとめを記載してください>
-        2. 情報1
-            <情報のまとめを記載してください>
-        3. 情報2
-            <情報のまとめを記載してください>
-
-        【Fusicから提案可能な開発事例】
-        1. <開発事例1のタイトル>: <開発事例1のURL>
-            情報
-        2. <開発事例2のタイトル>: <開発事例2のURL>
-            情報
-        3. <開発事例3のタイトル>: <開発事例3のURL>
-            情報
-        ---
-        """
-
-        try:
-            result = agent(prompt)
-            
-            if hasattr(result, 'message'):
-                final_message_blocks = result.message.get("content", [])
-                final_text = "\n".join(block.get("text", "") for block in final_message_blocks if "text" in block)
-            else:
-                final_text = str(result)
-                
-            return {"summary": final_text, "extracted_info": extracted_info}
-            
-        except Exception as e:
-            import traceback
-            error_details = traceback.format_exc()
-            return {"error": f"Failed to process image: {str(e)}", "details": error_details}
-
-    except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        return {"error": f"Failed to process image: {str(e)}", "details": error_details}
+        job_queue.put_nowait((job_id, content, file.content_type))
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="混み合っています。しばらくしてから再度お試しください") from None
+    jobs[job_id] = {"status": "queued", "result": None, "error": None, "updated_at": time.monotonic()}
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="ジョブが見つかりません")
+    return {"job_id": job_id, "status": job["status"], "result": job["result"], "error": job["error"]}
@@ -1,6 +1,7 @@
 """S3サービス - 画像のアップロードと一時URL生成"""
 import os
 import uuid
+import base64
 import logging
 from datetime import datetime, timedelta
 from typing import Optional
@@ -13,11 +14,17 @@ from botocore.config import Config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def generate_object_id() -> str:
+    """UUID4 の 16 バイトを URL セーフ base64 化した 22 文字の ID を生成"""
+    return base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode("ascii")
+
 class S3Service:
     def __init__(self):
         """S3サービスの初期化"""
         self.bucket_name = os.getenv("AWS_S3_BUCKET_NAME", "business-card-results")
         self.region = os.getenv("AWS_REGION", "ap-northeast-1")
+        # 公開オブジェクトの URL プレフィクス (リクエストごとの組み立てを避ける)
+        self.public_url_prefix = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/"
         
         # S3クライアントの初期化
         try:
@@ -27,7 +34,8 @@ class S3Service:
                 region_name=self.region,
                 config=Config(
                     signature_version='s3v4',
-                    retries={'max_attempts': 3}
+                    retries={'max_attempts': 3},
+                    max_pool_connections=50
                 )
             )
             
@@ -53,7 +61,7 @@ class S3Service:
             # ユニークなファイル名を生成
             file_extension = self._get_file_extension(content_type)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            unique_id = str(uuid.uuid4())[:8]
+            unique_id = generate_object_id()
             object_key = f"business-card-results/{timestamp}_{unique_id}{file_extension}"
             
             # S3にアップロード
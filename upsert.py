@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import os
 import re
+import mmap
+import asyncio
 import uuid
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Sequence, Dict
-from tqdm import tqdm
+from tqdm.asyncio import tqdm_asyncio
 from dotenv import load_dotenv
 
 import openai
+import tiktoken
 from pinecone.grpc import PineconeGRPC as Pinecone
 
 # ---------------------------------------------------------------------------- #
@@ -18,6 +22,24 @@ from pinecone.grpc import PineconeGRPC as Pinecone
 logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(message)s")
 LOGGER = logging.getLogger(__name__)
 
+load_dotenv()
+
+# 埋め込みモデル (main.py の検索側と同じモデル・次元数を使う)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", 512))
+
+# 1 リクエストあたりの埋め込み入力数 (OpenAI のリクエスト上限内に収める)
+EMBED_BATCH_SIZE = 96
+# 同時に処理するファイル数 (OpenAI のレート制限対策)
+EMBED_CONCURRENCY = 8
+# 1 リクエストあたりの Pinecone upsert 件数 (Pinecone の推奨上限)
+UPSERT_BATCH_SIZE = 100
+
+# トークン単位のチャンク設定 (upsert.py / upsert_topics.py で共通)
+CHUNK_ENCODING_NAME = "cl100k_base"
+CHUNK_TOKENS = 512
+CHUNK_OVERLAP_TOKENS = 64
+
 # ディレクトリ設定
 BOOTH_DIR = "booth"
 TOPICS_DIR = "topics"
@@ -37,37 +59,84 @@ def load_env():
 
 def init_openai(api_key: str):
     openai.api_key = api_key
-    return openai.OpenAI(api_key=api_key)
+    return openai.AsyncOpenAI(api_key=api_key)
 
 def init_pinecone(api_key: str, index_name: str):
     pc = Pinecone(api_key=api_key)
     return pc.Index(index_name)
 
-def markdown_to_plain(md_text: str) -> str:
-    """Markdown をプレーンテキストに変換"""
-    # Markdown の簡易変換 (HTMLタグを削除)
-    return re.sub(r"<[^>]+>", "", md_text).replace("\n", " ").strip()
+def upsert_in_batches(index, vectors: List[Dict]) -> None:
+    """UPSERT_BATCH_SIZE 件ずつ非同期 (gRPC future) でアップロードし、全件の完了を待つ"""
+    futures = [
+        index.upsert(vectors=vectors[i:i + UPSERT_BATCH_SIZE], async_req=True)
+        for i in range(0, len(vectors), UPSERT_BATCH_SIZE)
+    ]
+    for future in futures:
+        future.result()
 
-def embed_text(client: openai.OpenAI, text: str) -> List[float]:
-    response = client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=[text]
-    )
-    return response.data[0].embedding
+_TAG_OR_NEWLINE = re.compile(r"<[^>]+>|\r?\n")  # バイナリ読み込みのため CRLF も対象
 
-def chunk_text(text: str, max_chars: int) -> List[str]:
-    """テキストを指定した文字数でチャンク化"""
-    return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+def _strip_tag_or_newline(match: re.Match) -> str:
+    return "" if match.group(0).startswith("<") else " "
 
-def process_md(file_path: str, file_name: str, client: openai.OpenAI, data_type: str) -> List[Dict]:
+def markdown_to_plain(md_text: str) -> str:
+    """Markdown をプレーンテキストに変換"""
+    # Markdown の簡易変換 (HTMLタグを削除し、改行を空白に置換) を 1 パスで実施
+    return _TAG_OR_NEWLINE.sub(_strip_tag_or_newline, md_text).strip()
+
+async def embed_texts(client: openai.AsyncOpenAI, texts: List[str]) -> List[List[float]]:
+    """複数テキストを EMBED_BATCH_SIZE 件ずつまとめてベクトル化 (入力順を保持)"""
+    embeddings: List[List[float]] = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        batch = texts[start:start + EMBED_BATCH_SIZE]
+        response = await client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=batch,
+            dimensions=EMBEDDING_DIMENSIONS
+        )
+        ordered = sorted(response.data, key=lambda d: d.index)
+        embeddings.extend(d.embedding for d in ordered)
+    return embeddings
+
+def read_markdown(file_path: str) -> str:
+    """ファイルを mmap で読み込み、UTF-8 として一度だけデコード"""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:  # 空ファイルは mmap できない
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:].decode("utf-8")
+
+@lru_cache(maxsize=None)
+def _encoding() -> tiktoken.Encoding:
+    """初回利用時にエンコーディングを読み込む (import 時のダウンロードを避ける)"""
+    return tiktoken.get_encoding(CHUNK_ENCODING_NAME)
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+    """テキストを指定したトークン数でオーバーラップ付きチャンク化"""
+    encoding = _encoding()
+    tokens = encoding.encode(text)
+    step = max_tokens - overlap
+    chunks = []
+    for i in range(0, len(tokens), step):
+        # マルチバイト文字の途中で切れた端のバイトは捨てる (前後のオーバーラップ側に残る)
+        chunk = encoding.decode_bytes(tokens[i:i + max_tokens]).decode("utf-8", errors="ignore")
+        if chunk.strip():
+            chunks.append(chunk)
+        if i + max_tokens >= len(tokens):
+            break
+    return chunks
+
+async def process_md(
+    file_path: str, file_name: str, client: openai.AsyncOpenAI, data_type: str, sem: asyncio.Semaphore
+) -> List[Dict]:
     """Markdown ファイルを読み取り、チャンク化してベクトルとメタデータを生成"""
-    with open(file_path, "r", encoding="utf-8") as f:
-        md_text = f.read()
-    plain_text = markdown_to_plain(md_text)
-    chunks = chunk_text(plain_text, max_chars=500)  # 500文字でチャンク化
+    async with sem:
+        md_text = read_markdown(file_path)
+        plain_text = markdown_to_plain(md_text)
+        chunks = chunk_text(plain_text)  # 512トークン (64トークン重複) でチャンク化
+        embeddings = await embed_texts(client, chunks)
     vectors = []
-    for idx, chunk in enumerate(chunks):
-        embedding = embed_text(client, chunk)
+    for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
         vectors.append({
             "id": f"{data_type}-{file_name}-chunk{idx+1}",
             "values": embedding,
@@ -80,49 +149,65 @@ def process_md(file_path: str, file_name: str, client: openai.OpenAI, data_type:
         })
     return vectors
 
-def process_directory(directory: str, data_type: str, client: openai.OpenAI) -> List[Dict]:
-    """指定されたディレクトリのマークダウンファイルを処理"""
+async def process_directory(
+    directory: str, data_type: str, client: openai.AsyncOpenAI, sem: asyncio.Semaphore
+) -> List[Dict]:
+    """指定されたディレクトリのマークダウンファイルを並行処理"""
     if not os.path.exists(directory):
         LOGGER.warning(f"Directory '{directory}' does not exist. Skipping...")
         return []
     
+    with os.scandir(directory) as it:
+        tasks = [
+            process_md(entry.path, entry.name, client, data_type, sem)
+            for entry in it
+            if entry.is_file() and entry.name.lower().endswith(".md")
+        ]
+    results = await tqdm_asyncio.gather(*tasks, desc=f"📄 Processing {data_type} files")
+    
     all_vectors = []
-    for fname in tqdm(os.listdir(directory), desc=f"📄 Processing {data_type} files"):
-        if not fname.lower().endswith(".md"):
-            continue
-        path = os.path.join(directory, fname)
-        vectors = process_md(path, fname, client, data_type)
+    for vectors in results:
         all_vectors.extend(vectors)
-    
     return all_vectors
 
+async def embed_directories(api_key: str) -> tuple[List[Dict], List[Dict]]:
+    """Booth / Topic ディレクトリを同一イベントループ上でまとめてベクトル化"""
+    client = init_openai(api_key)
+    sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+    try:
+        booth_vectors, topic_vectors = await asyncio.gather(
+            process_directory(BOOTH_DIR, "booth", client, sem),
+            process_directory(TOPICS_DIR, "tpics", client, sem),
+        )
+        return booth_vectors, topic_vectors
+    finally:
+        await client.close()
+
 # ---------------------------------------------------------------------------- #
 # Main upsert routine
 # ---------------------------------------------------------------------------- #
 
-def upsert_topics():
-    """両方のインデックスにデータをアップロード"""
+def upsert_topics() -> tuple[List[Dict], List[Dict]]:
+    """両方のインデックスにデータをアップロードし、(booth, topic) のベクトルを返す"""
     env = load_env()
-    client = init_openai(env["openai_api_key"])
+    booth_vectors, topic_vectors = asyncio.run(embed_directories(env["openai_api_key"]))
     
     # Booth インデックスの処理
     booth_index = init_pinecone(env["pinecone_api_key"], env["pinecone_booth_index_name"])
-    booth_vectors = process_directory(BOOTH_DIR, "booth", client)
     
     if booth_vectors:
         print(f"\n✨ Booth インデックスに {len(booth_vectors)} 件のベクトルをアップロード中...")
-        booth_index.upsert(booth_vectors)
+        upsert_in_batches(booth_index, booth_vectors)
         print("✅ Booth データのアップロード完了！")
     else:
         print("⚠️  Booth データが見つかりませんでした")
     
     # Topic インデックスの処理
     topic_index = init_pinecone(env["pinecone_api_key"], env["pinecone_topic_index_name"])
-    topic_vectors = process_directory(TOPICS_DIR, "tpics", client)
     
     if topic_vectors:
         print(f"\n✨ Topic インデックスに {len(topic_vectors)} 件のベクトルをアップロード中...")
-        topic_index.upsert(topic_vectors)
+        upsert_in_batches(topic_index, topic_vectors)
         print("✅ Topic データのアップロード完了！")
     else:
         print("⚠️  Topic データが見つかりませんでした")
@@ -130,6 +215,7 @@ def upsert_topics():
     print(f"\n🎉 全体の処理が完了しました！")
     print(f"   - Booth vectors: {len(booth_vectors)}")
     print(f"   - Topic vectors: {len(topic_vectors)}")
+    return booth_vectors, topic_vectors
 
 if __name__ == "__main__":
     upsert_topics()
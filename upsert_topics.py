@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import os
 import re
+import mmap
+import asyncio
 import uuid
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Sequence, Dict
-from tqdm import tqdm
+from tqdm.asyncio import tqdm_asyncio
 from dotenv import load_dotenv
 
 import openai
+import tiktoken
 from pinecone.grpc import PineconeGRPC as Pinecone
 
 # ---------------------------------------------------------------------------- #
@@ -18,6 +22,24 @@ from pinecone.grpc import PineconeGRPC as Pinecone
 logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(message)s")
 LOGGER = logging.getLogger(__name__)
 
+load_dotenv()
+
+# 埋め込みモデル (main.py の検索側と同じモデル・次元数を使う)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", 512))
+
+# 1 リクエストあたりの埋め込み入力数 (OpenAI のリクエスト上限内に収める)
+EMBED_BATCH_SIZE = 96
+# 同時に処理するファイル数 (OpenAI のレート制限対策)
+EMBED_CONCURRENCY = 8
+# 1 リクエストあたりの Pinecone upsert 件数 (Pinecone の推奨上限)
+UPSERT_BATCH_SIZE = 100
+
+# トークン単位のチャンク設定 (upsert.py / upsert_topics.py で共通)
+CHUNK_ENCODING_NAME = "cl100k_base"
+CHUNK_TOKENS = 512
+CHUNK_OVERLAP_TOKENS = 64
+
 MD_DIR = "topics"
 
 def load_env():
@@ -34,37 +56,84 @@ def load_env():
 
 def init_openai(api_key: str):
     openai.api_key = api_key
-    return openai.OpenAI(api_key=api_key)
+    return openai.AsyncOpenAI(api_key=api_key)
 
 def init_pinecone(api_key: str, index_name: str):
     pc = Pinecone(api_key=api_key)
     return pc.Index(index_name)
 
-def markdown_to_plain(md_text: str) -> str:
-    """Markdown をプレーンテキストに変換"""
-    # Markdown の簡易変換 (HTMLタグを削除)
-    return re.sub(r"<[^>]+>", "", md_text).replace("\n", " ").strip()
+def upsert_in_batches(index, vectors: List[Dict]) -> None:
+    """UPSERT_BATCH_SIZE 件ずつ非同期 (gRPC future) でアップロードし、全件の完了を待つ"""
+    futures = [
+        index.upsert(vectors=vectors[i:i + UPSERT_BATCH_SIZE], async_req=True)
+        for i in range(0, len(vectors), UPSERT_BATCH_SIZE)
+    ]
+    for future in futures:
+        future.result()
 
-def embed_text(client: openai.OpenAI, text: str) -> List[float]:
-    response = client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=[text]
-    )
-    return response.data[0].embedding
+_TAG_OR_NEWLINE = re.compile(r"<[^>]+>|\r?\n")  # バイナリ読み込みのため CRLF も対象
 
-def chunk_text(text: str, max_chars: int) -> List[str]:
-    """テキストを指定した文字数でチャンク化"""
-    return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+def _strip_tag_or_newline(match: re.Match) -> str:
+    return "" if match.group(0).startswith("<") else " "
 
-def process_md(file_path: str, file_name: str, client: openai.OpenAI) -> List[Dict]:
+def markdown_to_plain(md_text: str) -> str:
+    """Markdown をプレーンテキストに変換"""
+    # Markdown の簡易変換 (HTMLタグを削除し、改行を空白に置換) を 1 パスで実施
+    return _TAG_OR_NEWLINE.sub(_strip_tag_or_newline, md_text).strip()
+
+async def embed_texts(client: openai.AsyncOpenAI, texts: List[str]) -> List[List[float]]:
+    """複数テキストを EMBED_BATCH_SIZE 件ずつまとめてベクトル化 (入力順を保持)"""
+    embeddings: List[List[float]] = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        batch = texts[start:start + EMBED_BATCH_SIZE]
+        response = await client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=batch,
+            dimensions=EMBEDDING_DIMENSIONS
+        )
+        ordered = sorted(response.data, key=lambda d: d.index)
+        embeddings.extend(d.embedding for d in ordered)
+    return embeddings
+
+def read_markdown(file_path: str) -> str:
+    """ファイルを mmap で読み込み、UTF-8 として一度だけデコード"""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:  # 空ファイルは mmap できない
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:].decode("utf-8")
+
+@lru_cache(maxsize=None)
+def _encoding() -> tiktoken.Encoding:
+    """初回利用時にエンコーディングを読み込む (import 時のダウンロードを避ける)"""
+    return tiktoken.get_encoding(CHUNK_ENCODING_NAME)
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+    """テキストを指定したトークン数でオーバーラップ付きチャンク化"""
+    encoding = _encoding()
+    tokens = encoding.encode(text)
+    step = max_tokens - overlap
+    chunks = []
+    for i in range(0, len(tokens), step):
+        # マルチバイト文字の途中で切れた端のバイトは捨てる (前後のオーバーラップ側に残る)
+        chunk = encoding.decode_bytes(tokens[i:i + max_tokens]).decode("utf-8", errors="ignore")
+        if chunk.strip():
+            chunks.append(chunk)
+        if i + max_tokens >= len(tokens):
+            break
+    return chunks
+
+async def process_md(
+    file_path: str, file_name: str, client: openai.AsyncOpenAI, sem: asyncio.Semaphore
+) -> List[Dict]:
     """Markdown ファイルを読み取り、チャンク化してベクトルとメタデータを生成"""
-    with open(file_path, "r", encoding="utf-8") as f:
-        md_text = f.read()
-    plain_text = markdown_to_plain(md_text)
-    chunks = chunk_text(plain_text, max_chars=500)  # 500文字でチャンク化
+    async with sem:
+        md_text = read_markdown(file_path)
+        plain_text = markdown_to_plain(md_text)
+        chunks = chunk_text(plain_text)  # 512トークン (64トークン重複) でチャンク化
+        embeddings = await embed_texts(client, chunks)
     vectors = []
-    for idx, chunk in enumerate(chunks):
-        embedding = embed_text(client, chunk)
+    for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
         vectors.append({
             "id": f"{file_name}-chunk{idx+1}",
             "values": embedding,
@@ -76,25 +145,37 @@ def process_md(file_path: str, file_name: str, client: openai.OpenAI) -> List[Di
         })
     return vectors
 
+async def process_directory(directory: str, api_key: str) -> List[Dict]:
+    """ディレクトリ内のマークダウンファイルを並行してベクトル化"""
+    client = init_openai(api_key)
+    sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+    with os.scandir(directory) as it:
+        tasks = [
+            process_md(entry.path, entry.name, client, sem)
+            for entry in it
+            if entry.is_file() and entry.name.lower().endswith(".md")
+        ]
+    try:
+        results = await tqdm_asyncio.gather(*tasks, desc="📄 Processing Markdown files")
+    finally:
+        await client.close()
+
+    all_vectors = []
+    for vectors in results:
+        all_vectors.extend(vectors)
+    return all_vectors
+
 # ---------------------------------------------------------------------------- #
 # Main upsert routine
 # ---------------------------------------------------------------------------- #
 
 def upsert_topics():
     env = load_env()
-    client = init_openai(env["openai_api_key"])
     index = init_pinecone(env["pinecone_api_key"], env["pinecone_index_name"])
-    all_vectors = []
-
-    for fname in tqdm(os.listdir(MD_DIR), desc="📄 Processing Markdown files"):
-        if not fname.lower().endswith(".md"):
-            continue
-        path = os.path.join(MD_DIR, fname)
-        vectors = process_md(path, fname, client)
-        all_vectors.extend(vectors)
+    all_vectors = asyncio.run(process_directory(MD_DIR, env["openai_api_key"]))
 
     print(f"\n✨ Pineconeに {len(all_vectors)} 件のベクトルをアップロード中...")
-    index.upsert(all_vectors)
+    upsert_in_batches(index, all_vectors)
     print("✅ アップロード完了！")
 
 if __name__ == "__main__":